@@ -1,616 +1,956 @@
-import streamlit as st
-import pandas as pd
-import numpy as np
-import plotly.express as px
-from datetime import datetime
-import os
-from plotly.subplots import make_subplots
-import gdown
-import requests
-
-# =============================================
-# CONFIGURACIÓN INICIAL
-# =============================================
-st.set_page_config(
-    page_title="Panel de Ventas SPV",
-    page_icon="📊",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# =============================================
-# FUNCIÓN PARA CARGAR DATOS (VERSIÓN PARA DEPLOY)
-# =============================================
-@st.cache_data(ttl=3600)
-def load_data():
-    import tempfile
-    import time
-    
-    file_urls = [
-        "https://drive.google.com/uc?id=10NLcCVPLe3q9kpqFyOeCrOSY9d5U-WSA",
-        "https://docs.google.com/spreadsheets/d/10NLcCVPLe3q9kpqFyOeCrOSY9d5U-WSA/export?format=xlsx"
-    ]
-    
-    for i, file_url in enumerate(file_urls):
-        try:
-            # Crear archivo temporal con nombre único
-            temp_file = os.path.join(tempfile.gettempdir(), f"ventas_spv_temp_{int(time.time())}_{i}.xlsx")
-            
-            with st.spinner(f"Descargando desde fuente {i+1}..."):
-                # Método de descarga alternativo
-                if "drive.google.com" in file_url:
-                    import gdown
-                    gdown.download(file_url, temp_file, quiet=True, fuzzy=True)
-                else:
-                    import requests
-                    headers = {
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-                    }
-                    response = requests.get(file_url, headers=headers, stream=True, timeout=30)
-                    response.raise_for_status()
-                    
-                    with open(temp_file, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-            
-            # Verificar que el archivo se descargó correctamente
-            if os.path.getsize(temp_file) == 0:
-                raise ValueError("El archivo descargado está vacío")
-            
-            # Leer con openpyxl para mejor compatibilidad
-            df = pd.read_excel(temp_file, engine='openpyxl')
-            
-            # Validación de columnas
-            required_columns = ['Vendedor', 'Fecha Pedido', 'Nombre Cliente', 'Codigo Cliente',
-                              'Pedido', 'Codigo Producto', 'Nombre Producto', 'Cantidad',
-                              'Precio', 'Monto Total', 'Caja', 'Centro']
-            
-            if not all(col in df.columns for col in required_columns):
-                missing = [col for col in required_columns if col not in df.columns]
-                st.warning(f"Fuente {i+1}: Faltan columnas: {', '.join(missing)}")
-                continue
-                
-            # Procesamiento exitoso
-            return df
-            
-        except Exception as e:
-            st.warning(f"Intento {i+1} fallido: {str(e)}")
-            continue
-            
-        finally:
-            # Limpieza garantizada del archivo temporal
-            if 'temp_file' in locals() and os.path.exists(temp_file):
-                try:
-                    os.remove(temp_file)
-                except:
-                    pass
-    
-    st.error("❌ No se pudo cargar el archivo desde ninguna fuente disponible")
-    return None
-
-# =============================================
-# CARGA Y VALIDACIÓN DE DATOS
-# =============================================
-with st.spinner("🔍 Cargando y validando datos..."):
-    df = load_data()
-
-# Validación de datos cargados
-if df is None:
-    st.error("🚨 No se pudieron cargar los datos. La aplicación se detendrá.")
-    st.stop()
-
-if not isinstance(df, pd.DataFrame) or df.empty:
-    st.error("⚠️ Los datos cargados no son válidos o están vacíos.")
-    st.stop()
-
-# =============================================
-# PROCESAMIENTO DE DATOS
-# =============================================
-try:
-    # Extraer componentes de fecha
-    df['Mes'] = df['Fecha Pedido'].dt.month
-    df['Ano'] = df['Fecha Pedido'].dt.year
-    df['Dia'] = df['Fecha Pedido'].dt.day
-    df['Dia Semana'] = df['Fecha Pedido'].dt.day_name()
-    df['Semana'] = df['Fecha Pedido'].dt.isocalendar().week
-    df['Hora'] = df['Fecha Pedido'].dt.hour
-    
-    # Ordenar días de la semana
-    dias_semana = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    df['Dia Semana'] = pd.Categorical(df['Dia Semana'], categories=dias_semana, ordered=True)
-    
-    # Calcular días hábiles
-    df['Es Dia Habitl'] = df['Dia Semana'].isin(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'])
-    
-    # Definir variables globales para fechas
-    global fecha_min, fecha_max
-    fecha_min = df['Fecha Pedido'].min().strftime('%d/%m/%Y')
-    fecha_max = df['Fecha Pedido'].max().strftime('%d/%m/%Y')
-
-except Exception as e:
-    st.error(f"❌ Error al procesar fechas: {str(e)}")
-    st.stop()
-
-# =============================================
-# BARRA LATERAL (FILTROS)
-# =============================================
-st.sidebar.title("🔍 Filtros Principales")
-st.sidebar.markdown("---")
-
-# Selector de Año
-try:
-    años_disponibles = sorted(df['Ano'].unique())
-    año_seleccionado = st.sidebar.selectbox(
-        "**Seleccione el Año**",
-        options=años_disponibles,
-        index=len(años_disponibles)-1
-    )
-
-    # Selector de Mes (filtrado por año seleccionado)
-    meses_disponibles = sorted(df[df['Ano'] == año_seleccionado]['Mes'].unique())
-    mes_seleccionado = st.sidebar.selectbox(
-        "**Seleccione el Mes**", 
-        options=meses_disponibles,
-        index=len(meses_disponibles)-1 if meses_disponibles else 0
-    )
-except Exception as e:
-    st.error(f"❌ Error en los filtros de fecha: {str(e)}")
-    st.stop()
-
-# Filtros adicionales
-try:
-    centros_disponibles = df['Centro'].unique()
-    centros_seleccionados = st.sidebar.multiselect(
-        "**Filtrar por Centro**",
-        options=centros_disponibles,
-        default=centros_disponibles
-    )
-
-    vendedores_disponibles = df['Vendedor'].unique()
-    vendedores_seleccionados = st.sidebar.multiselect(
-        "**Filtrar por Vendedor**",
-        options=vendedores_disponibles,
-        default=vendedores_disponibles
-    )
-except Exception as e:
-    st.error(f"❌ Error en los filtros adicionales: {str(e)}")
-    st.stop()
-
-# Aplicar filtros
-try:
-    df_filtrado = df[
-        (df['Ano'] == año_seleccionado) &
-        (df['Mes'] == mes_seleccionado) &
-        (df['Centro'].isin(centros_seleccionados)) &
-        (df['Vendedor'].isin(vendedores_seleccionados))
-    ].copy()
-    
-    if df_filtrado.empty:
-        st.warning("⚠️ No hay datos con los filtros seleccionados. Mostrando todos los datos.")
-        df_filtrado = df.copy()
-except Exception as e:
-    st.error(f"❌ Error al aplicar filtros: {str(e)}")
-    st.stop()
-
-# =============================================
-# PESTAÑAS PRINCIPALES
-# =============================================
-tab1, tab2, tab3, tab4 = st.tabs([
-    "📈 Resumen Ventas", 
-    "📋 Pedidos por Vendedor", 
-    "🏢 Ventas por Cliente", 
-    "🔎 Búsqueda de Productos"
-])
-
-# --- Pestaña 1: Resumen de Ventas ---
-with tab1:
-    try:
-        st.header("📊 Resumen General de Ventas")
-        
-        # KPIs principales
-        ventas_totales = df_filtrado['Monto Total'].sum()
-        cajas_totales = df_filtrado['Caja'].sum()
-        pedidos_totales = df_filtrado['Pedido'].nunique()
-        ticket_promedio = ventas_totales / pedidos_totales if pedidos_totales > 0 else 0
-        clientes_unicos = df_filtrado['Codigo Cliente'].nunique()
-        
-        # Mostrar KPIs
-        col1, col2, col3, col4, col5 = st.columns(5)
-        col1.metric("**Ventas Totales**", f"${ventas_totales:,.0f}")
-        col2.metric("**Cajas Vendidas**", f"{cajas_totales:,.0f}")
-        col3.metric("**Pedidos Realizados**", f"{pedidos_totales:,.0f}")
-        col4.metric("**Ticket Promedio**", f"${ticket_promedio:,.0f}")
-        col5.metric("**Clientes Atendidos**", f"{clientes_unicos:,.0f}")
-        
-        st.markdown("---")
-        
-        # Comparación con mes anterior
-        st.subheader("📅 Comparación Mensual")
-        
-        mes_anterior = mes_seleccionado - 1 if mes_seleccionado > 1 else 12
-        año_mes_anterior = año_seleccionado if mes_seleccionado > 1 else año_seleccionado - 1
-        
-        df_mes_anterior = df[
-            (df['Ano'] == año_mes_anterior) & 
-            (df['Mes'] == mes_anterior) &
-            (df['Centro'].isin(centros_seleccionados)) &
-            (df['Vendedor'].isin(vendedores_seleccionados))
-        ]
-        
-        ventas_mes_anterior = df_mes_anterior['Monto Total'].sum()
-        variacion = ((ventas_totales - ventas_mes_anterior) / ventas_mes_anterior * 100) if ventas_mes_anterior != 0 else 0
-        
-        col1, col2 = st.columns(2)
-        col1.metric(
-            f"**Ventas {mes_seleccionado}/{año_seleccionado}**",
-            f"${ventas_totales:,.0f}",
-            f"{variacion:.1f}% vs mes anterior",
-            delta_color="inverse" if variacion < 0 else "normal"
-        )
-        col2.metric(
-            f"**Ventas {mes_anterior}/{año_mes_anterior}**",
-            f"${ventas_mes_anterior:,.0f}"
-        )
-        
-        st.markdown("---")
-        
-        # Gráficos de análisis
-        st.subheader("📊 Análisis por Dimensiones")
-        
-        # Ventas por vendedor
-        ventas_vendedor = df_filtrado.groupby('Vendedor').agg({
-            'Monto Total': 'sum',
-            'Pedido': 'nunique',
-            'Caja': 'sum'
-        }).reset_index().sort_values('Monto Total', ascending=False)
-        
-        fig1 = px.bar(
-            ventas_vendedor,
-            x='Vendedor',
-            y='Monto Total',
-            title='**Ventas Totales por Vendedor**',
-            color='Pedido',
-            labels={'Monto Total': 'Ventas ($)', 'Pedido': 'N° Pedidos'},
-            hover_data=['Caja']
-        )
-        st.plotly_chart(fig1, use_container_width=True)
-        
-        # Ventas por centro
-        ventas_centro = df_filtrado.groupby('Centro').agg({
-            'Monto Total': 'sum',
-            'Caja': 'sum'
-        }).reset_index().sort_values('Monto Total', ascending=False)
-        
-        fig2 = px.pie(
-            ventas_centro,
-            names='Centro',
-            values='Monto Total',
-            title='**Distribución de Ventas por Centro**',
-            hole=0.3,
-            hover_data=['Caja']
-        )
-        st.plotly_chart(fig2, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"❌ Error en la pestaña de Resumen: {str(e)}")
-
-# --- Pestaña 2: Pedidos por Vendedor ---
-with tab2:
-    try:
-        st.header("📋 Análisis de Pedidos por Vendedor")
-        
-        # Configuración de objetivos
-        st.subheader("🎯 Configuración de Objetivos")
-        objetivo_default = 45
-        objetivo = st.number_input(
-            "**Establezca el objetivo diario de pedidos por vendedor**",
-            min_value=1,
-            value=objetivo_default,
-            step=1
-        )
-        
-        st.markdown("---")
-        
-        # Cálculo de métricas
-        dias_habiles = df_filtrado['Dia'].nunique()
-        objetivo_mensual = objetivo * dias_habiles
-        
-        pedidos_vendedor = df_filtrado.groupby('Vendedor').agg({
-            'Pedido': 'nunique',
-            'Dia': 'nunique',
-            'Monto Total': 'sum'
-        }).reset_index()
-        
-        pedidos_vendedor['Pedidos/Día'] = pedidos_vendedor['Pedido'] / pedidos_vendedor['Dia']
-        pedidos_vendedor['Cumplimiento %'] = (pedidos_vendedor['Pedidos/Día'] / objetivo) * 100
-        pedidos_vendedor['Desviación'] = pedidos_vendedor['Pedido'] - objetivo_mensual
-        
-        # Mostrar tabla resumen
-        st.subheader("📊 Cumplimiento por Vendedor")
-        
-        st.dataframe(
-            pedidos_vendedor.sort_values('Cumplimiento %', ascending=False),
-            column_config={
-                "Vendedor": "Vendedor",
-                "Pedido": st.column_config.NumberColumn("Total Pedidos", format="%d"),
-                "Dia": st.column_config.NumberColumn("Días Trabajados", format="%d"),
-                "Pedidos/Día": st.column_config.NumberColumn("Pedidos/Día", format="%.1f"),
-                "Cumplimiento %": st.column_config.ProgressColumn(
-                    "Cumplimiento %",
-                    format="%.1f%%",
-                    min_value=0,
-                    max_value=150
-                ),
-                "Desviación": st.column_config.NumberColumn("Desviación vs Objetivo", format="%+d"),
-                "Monto Total": st.column_config.NumberColumn("Ventas Generadas", format="$%.0f")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        st.markdown("---")
-        
-        # Gráfico de tendencia de pedidos
-        st.subheader("📈 Tendencia de Pedidos")
-        
-        pedidos_dia_semana = df_filtrado.groupby(['Dia Semana', 'Vendedor'])['Pedido'].nunique().reset_index()
-        
-        fig3 = px.bar(
-            pedidos_dia_semana,
-            x='Dia Semana',
-            y='Pedido',
-            color='Vendedor',
-            title='**Pedidos por Día de la Semana**',
-            labels={'Pedido': 'N° de Pedidos', 'Dia Semana': 'Día'},
-            barmode='group'
-        )
-        fig3.add_hline(y=objetivo, line_dash="dash", line_color="red", annotation_text="Objetivo Diario")
-        st.plotly_chart(fig3, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"❌ Error en la pestaña de Pedidos: {str(e)}")
-
-# --- Pestaña 3: Ventas por Cliente ---
-with tab3:
-    try:
-        st.header("🏢 Análisis de Ventas por Cliente")
-        
-        # Selector de clientes
-        clientes_seleccionados = st.multiselect(
-            "**Seleccione clientes para analizar**",
-            options=df_filtrado['Nombre Cliente'].unique(),
-            default=df_filtrado['Nombre Cliente'].unique()[:3] if len(df_filtrado['Nombre Cliente'].unique()) > 0 else []
-        )
-        
-        if not clientes_seleccionados:
-            st.warning("⚠️ Por favor seleccione al menos un cliente.")
-            st.stop()
-        
-        df_clientes = df_filtrado[df_filtrado['Nombre Cliente'].isin(clientes_seleccionados)]
-        
-        # Resumen por cliente
-        st.subheader("📋 Resumen por Cliente")
-        
-        resumen_clientes = df_clientes.groupby(['Codigo Cliente', 'Nombre Cliente']).agg({
-            'Pedido': 'nunique',
-            'Monto Total': 'sum',
-            'Caja': 'sum',
-            'Fecha Pedido': ['min', 'max']
-        }).reset_index()
-        
-        resumen_clientes.columns = [' '.join(col).strip() for col in resumen_clientes.columns.values]
-        
-        st.dataframe(
-            resumen_clientes.sort_values('Monto Total sum', ascending=False),
-            column_config={
-                "Codigo Cliente": "Código",
-                "Nombre Cliente": "Cliente",
-                "Pedido nunique": st.column_config.NumberColumn("Pedidos", format="%d"),
-                "Monto Total sum": st.column_config.NumberColumn("Total Vendido", format="$%.0f"),
-                "Caja sum": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
-                "Fecha Pedido min": st.column_config.DateColumn("Primer Pedido"),
-                "Fecha Pedido max": st.column_config.DateColumn("Último Pedido")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        st.markdown("---")
-        
-        # Detalle por cliente seleccionado
-        st.subheader("🔍 Detalle por Cliente")
-        
-        cliente_seleccionado = st.selectbox(
-            "**Seleccione un cliente para ver detalle**",
-            options=df_clientes['Nombre Cliente'].unique()
-        )
-        
-        df_cliente = df_clientes[df_clientes['Nombre Cliente'] == cliente_seleccionado]
-        
-        # Productos más comprados por el cliente
-        st.markdown(f"#### 🛍️ Productos más comprados por {cliente_seleccionado}")
-        
-        productos_cliente = df_cliente.groupby(['Codigo Producto', 'Nombre Producto']).agg({
-            'Cantidad': 'sum',
-            'Monto Total': 'sum',
-            'Caja': 'sum',
-            'Pedido': 'nunique'
-        }).reset_index().sort_values('Monto Total', ascending=False)
-        
-        st.dataframe(
-            productos_cliente,
-            column_config={
-                "Codigo Producto": "Código",
-                "Nombre Producto": "Producto",
-                "Cantidad": st.column_config.NumberColumn("Cantidad Total", format="%d"),
-                "Monto Total": st.column_config.NumberColumn("Total Vendido", format="$%.0f"),
-                "Caja": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
-                "Pedido": st.column_config.NumberColumn("Veces Pedido", format="%d")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        # Evolución temporal de compras
-        st.markdown(f"#### 📅 Evolución Temporal de Compras - {cliente_seleccionado}")
-        
-        evolucion = df_cliente.groupby(df_cliente['Fecha Pedido'].dt.date).agg({
-            'Monto Total': 'sum',
-            'Pedido': 'nunique'
-        }).reset_index()
-        
-        fig4 = make_subplots(specs=[[{"secondary_y": True}]])
-        
-        fig4.add_trace(
-            px.line(evolucion, x='Fecha Pedido', y='Monto Total', markers=True).data[0],
-            secondary_y=False
-        )
-        
-        fig4.add_trace(
-            px.bar(evolucion, x='Fecha Pedido', y='Pedido', opacity=0.3).data[0],
-            secondary_y=True
-        )
-        
-        fig4.update_layout(
-            title=f"Ventas a {cliente_seleccionado} por Fecha",
-            xaxis_title="Fecha",
-            yaxis_title="Ventas ($)",
-            yaxis2_title="N° Pedidos",
-            showlegend=True
-        )
-        
-        st.plotly_chart(fig4, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"❌ Error en la pestaña de Clientes: {str(e)}")
-
-# --- Pestaña 4: Búsqueda de Productos ---
-with tab4:
-    try:
-        st.header("🔎 Búsqueda Avanzada de Productos")
-        
-        # Selector de productos
-        productos_buscar = st.multiselect(
-            "**Seleccione productos a analizar**",
-            options=df['Nombre Producto'].unique(),
-            default=df['Nombre Producto'].unique()[:2] if len(df['Nombre Producto'].unique()) > 0 else []
-        )
-        
-        if not productos_buscar:
-            st.info("ℹ️ Seleccione al menos un producto para realizar la búsqueda.")
-            st.stop()
-        
-        df_productos = df[df['Nombre Producto'].isin(productos_buscar)]
-        
-        # Resumen de productos seleccionados
-        st.subheader("📋 Resumen de Productos Seleccionados")
-        
-        resumen_productos = df_productos.groupby(['Codigo Producto', 'Nombre Producto']).agg({
-            'Pedido': 'nunique',
-            'Cantidad': 'sum',
-            'Monto Total': 'sum',
-            'Caja': 'sum',
-            'Nombre Cliente': 'nunique',
-            'Fecha Pedido': ['min', 'max']
-        }).reset_index()
-        
-        resumen_productos.columns = [' '.join(col).strip() for col in resumen_productos.columns.values]
-        
-        st.dataframe(
-            resumen_productos,
-            column_config={
-                "Codigo Producto": "Código",
-                "Nombre Producto": "Producto",
-                "Pedido nunique": st.column_config.NumberColumn("Pedidos", format="%d"),
-                "Cantidad sum": st.column_config.NumberColumn("Cantidad Total", format="%d"),
-                "Monto Total sum": st.column_config.NumberColumn("Ventas Totales", format="$%.0f"),
-                "Caja sum": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
-                "Nombre Cliente nunique": st.column_config.NumberColumn("Clientes Únicos", format="%d"),
-                "Fecha Pedido min": st.column_config.DateColumn("Primera Venta"),
-                "Fecha Pedido max": st.column_config.DateColumn("Última Venta")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        st.markdown("---")
-        
-        # Detalle por producto seleccionado
-        st.subheader("🔍 Detalle por Producto")
-        
-        producto_seleccionado = st.selectbox(
-            "**Seleccione un producto para ver detalle**",
-            options=productos_buscar
-        )
-        
-        df_producto = df_productos[df_productos['Nombre Producto'] == producto_seleccionado]
-        
-        # Clientes que compraron este producto
-        st.markdown(f"#### 🧑‍💼 Clientes que compraron {producto_seleccionado}")
-        
-        clientes_producto = df_producto.groupby(['Codigo Cliente', 'Nombre Cliente']).agg({
-            'Pedido': 'nunique',
-            'Cantidad': 'sum',
-            'Monto Total': 'sum',
-            'Caja': 'sum',
-            'Fecha Pedido': 'max'
-        }).reset_index().sort_values('Monto Total', ascending=False)
-        
-        st.dataframe(
-            clientes_producto,
-            column_config={
-                "Codigo Cliente": "Código",
-                "Nombre Cliente": "Cliente",
-                "Pedido": st.column_config.NumberColumn("Veces Comprado", format="%d"),
-                "Cantidad": st.column_config.NumberColumn("Cantidad Total", format="%d"),
-                "Monto Total": st.column_config.NumberColumn("Total Gastado", format="$%.0f"),
-                "Caja": st.column_config.NumberColumn("Cajas Compradas", format="%d"),
-                "Fecha Pedido": st.column_config.DateColumn("Última Compra")
-            },
-            hide_index=True,
-            use_container_width=True
-        )
-        
-        # Evolución temporal de ventas del producto
-        st.markdown(f"#### 📈 Evolución de Ventas - {producto_seleccionado}")
-        
-        evolucion_producto = df_producto.groupby(df_producto['Fecha Pedido'].dt.to_period('M')).agg({
-            'Monto Total': 'sum',
-            'Pedido': 'nunique',
-            'Cantidad': 'sum'
-        }).reset_index()
-        evolucion_producto['Fecha Pedido'] = evolucion_producto['Fecha Pedido'].dt.to_timestamp()
-        
-        fig5 = px.line(
-            evolucion_producto,
-            x='Fecha Pedido',
-            y='Monto Total',
-            title=f"Ventas Mensuales de {producto_seleccionado}",
-            markers=True,
-            labels={'Monto Total': 'Ventas ($)', 'Fecha Pedido': 'Mes'}
-        )
-        fig5.add_bar(x=evolucion_producto['Fecha Pedido'], y=evolucion_producto['Pedido'], name="N° Pedidos")
-        st.plotly_chart(fig5, use_container_width=True)
-        
-    except Exception as e:
-        st.error(f"❌ Error en la pestaña de Productos: {str(e)}")
-
-# =============================================
-# BARRA LATERAL (INFORMACIÓN ADICIONAL)
-# =============================================
-st.sidebar.markdown("---")
-st.sidebar.markdown("**📌 Notas:**")
-st.sidebar.markdown("- Los datos se actualizan automáticamente al cambiar los filtros")
-st.sidebar.markdown("- Use los controles de los gráficos para zoom y detalles")
-st.sidebar.markdown("- Exporte datos con el menú de los gráficos (ícono de cámara)")
-
-st.sidebar.markdown("---")
-
-# Agregar botón de actualización
-if st.sidebar.button("🔄 Actualizar Datos", help="Haz clic para forzar la actualización de los datos"):
-    st.cache_data.clear()
-    st.rerun()
-
-st.sidebar.markdown(f"📅 **Datos desde:** {fecha_min} **hasta** {fecha_max}")
-st.sidebar.markdown(f"🔄 **Última actualización:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")
+import streamlit as st
+import pandas as pd
+import numpy as np
+import plotly.graph_objects as go
+from datetime import datetime
+import json
+import os
+from plotly.subplots import make_subplots
+import gdown
+import requests
+
+# =============================================
+# CONFIGURACIÓN INICIAL
+# =============================================
+st.set_page_config(
+    page_title="Panel de Ventas SPV",
+    page_icon="📊",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# =============================================
+# FUNCIÓN PARA CARGAR DATOS (VERSIÓN PARA DEPLOY)
+# =============================================
+def _procesar_df(df):
+    """Tipos categóricos y componentes de fecha, derivados una sola vez.
+
+    Se ejecuta dentro de load_data() para que el resultado quede cubierto
+    por el caché (y persistido en el Parquet) en lugar de recalcularse en
+    cada rerun de la sesión.
+    """
+    # Columnas de texto a tipo categórico: los filtros isin() y los groupby
+    # de las pestañas trabajan sobre códigos enteros en lugar de strings
+    for col in ['Vendedor', 'Centro', 'Nombre Cliente', 'Codigo Cliente',
+                'Nombre Producto', 'Codigo Producto']:
+        df[col] = df[col].astype('category')
+
+    # Extraer componentes de fecha
+    df['Mes'] = df['Fecha Pedido'].dt.month
+    df['Ano'] = df['Fecha Pedido'].dt.year
+    df['Dia'] = df['Fecha Pedido'].dt.day
+    df['Semana'] = df['Fecha Pedido'].dt.isocalendar().week
+    df['Hora'] = df['Fecha Pedido'].dt.hour
+
+    # Día de la semana como categórico ordenado
+    dias_semana = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    df['Dia Semana'] = df['Fecha Pedido'].dt.day_name().astype(
+        pd.CategoricalDtype(categories=dias_semana, ordered=True)
+    )
+
+    # Calcular días hábiles: comparación entera vectorizada (lunes=0..sábado=5)
+    df['Es Dia Habitl'] = df['Fecha Pedido'].dt.dayofweek.values < 6
+
+    # Tipos numéricos estrechos: la mitad (o menos) de bytes por columna
+    # en cada escaneo de los groupby/sum posteriores; las celdas no
+    # numéricas (o fechas NaT) se rellenan con 0 antes del downcast
+    for col, tipo in [('Cantidad', 'int32'), ('Caja', 'int32'), ('Mes', 'int8'),
+                      ('Ano', 'int16'), ('Dia', 'int8'), ('Hora', 'int8'),
+                      ('Semana', 'int8')]:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(tipo)
+
+    # Fechas truncadas a día y a mes, para las gráficas de evolución
+    df['FechaDia'] = df['Fecha Pedido'].dt.normalize()
+    df['FechaMes'] = df['Fecha Pedido'].dt.to_period('M').dt.to_timestamp()
+
+    # Código entero por pedido: nunique sobre enteros evita hashear strings
+    df['PedidoId'] = pd.factorize(df['Pedido'], sort=False)[0].astype('int32')
+
+    return df
+
+def _leer_excel(origen):
+    """Lee el .xlsx con calamine (Rust), mucho más rápido que openpyxl.
+
+    openpyxl queda como respaldo por si calamine rechaza alguna variante
+    inesperada del archivo.
+    """
+    try:
+        return pd.read_excel(origen, engine='calamine')
+    except Exception:
+        if hasattr(origen, 'seek'):
+            origen.seek(0)
+        return pd.read_excel(origen, engine='openpyxl')
+
+def _descargar_concurrente(file_urls):
+    """Descarga ambas fuentes en paralelo y devuelve (url, bytes) de la primera.
+
+    Con la descarga serial, un timeout de la primera fuente retrasaba el
+    intento de la segunda; la carrera acota la latencia a min(t1, t2).
+    """
+    import asyncio
+    import httpx
+
+    async def _carrera():
+        async def fetch(url):
+            async with httpx.AsyncClient(follow_redirects=True) as client:
+                r = await client.get(url, timeout=30)
+                r.raise_for_status()
+                if not r.content:
+                    raise ValueError("Respuesta vacía")
+                return url, r.content
+
+        pendientes = {asyncio.ensure_future(fetch(u)) for u in file_urls}
+        ganador = None
+        try:
+            while pendientes and ganador is None:
+                done, pendientes = await asyncio.wait(pendientes, return_when=asyncio.FIRST_COMPLETED)
+                for tarea in done:
+                    if tarea.exception() is None:
+                        ganador = tarea.result()
+                        break
+        finally:
+            for tarea in pendientes:
+                tarea.cancel()
+        return ganador
+
+    return asyncio.run(_carrera())
+
+# cache_resource comparte el mismo DataFrame en memoria entre todas las
+# sesiones del proceso (sin el pickle por sesión de cache_data); el frame
+# es de solo lectura después de la carga, nadie lo muta aguas abajo
+@st.cache_resource(ttl=3600)
+def load_data():
+    import io
+    import tempfile
+    import time
+    import json
+
+    file_urls = [
+        "https://drive.google.com/uc?id=10NLcCVPLe3q9kpqFyOeCrOSY9d5U-WSA",
+        "https://docs.google.com/spreadsheets/d/10NLcCVPLe3q9kpqFyOeCrOSY9d5U-WSA/export?format=xlsx"
+    ]
+
+    # Caché Parquet local: leer Parquet es mucho más rápido que parsear el
+    # .xlsx con openpyxl, así que solo se vuelve a descargar si la fuente cambió
+    parquet_path = os.path.join(tempfile.gettempdir(), "ventas_spv_cache.parquet")
+    sidecar_path = os.path.join(tempfile.gettempdir(), "ventas_spv_cache.json")
+
+    try:
+        if os.path.exists(parquet_path) and os.path.exists(sidecar_path):
+            with open(sidecar_path, 'r') as f:
+                sidecar = json.load(f)
+            head = requests.head(sidecar.get("url", ""), timeout=10, allow_redirects=True)
+            headers_actuales = {k: head.headers.get(k) for k in ("ETag", "Last-Modified")}
+            if any(headers_actuales.values()) and headers_actuales == sidecar.get("headers"):
+                df = pd.read_parquet(parquet_path, engine='pyarrow')
+                # Cachés escritos antes de incluir las columnas derivadas
+                if 'FechaMes' not in df.columns:
+                    df = _procesar_df(df)
+                return df
+    except Exception:
+        # Si el caché falla por cualquier motivo, se sigue con la descarga normal
+        pass
+
+    required_columns = ['Vendedor', 'Fecha Pedido', 'Nombre Cliente', 'Codigo Cliente',
+                      'Pedido', 'Codigo Producto', 'Nombre Producto', 'Cantidad',
+                      'Precio', 'Monto Total', 'Caja', 'Centro']
+
+    def _validar_columnas(df, fuente):
+        if not all(col in df.columns for col in required_columns):
+            missing = [col for col in required_columns if col not in df.columns]
+            st.warning(f"{fuente}: Faltan columnas: {', '.join(missing)}")
+            return False
+        return True
+
+    def _persistir_parquet(df, file_url):
+        # Persistir en Parquet junto con los headers HTTP de la fuente,
+        # para que las próximas cargas eviten openpyxl por completo
+        try:
+            df.to_parquet(parquet_path, engine='pyarrow', compression='zstd')
+            head = requests.head(file_url, timeout=10, allow_redirects=True)
+            with open(sidecar_path, 'w') as f:
+                json.dump({
+                    "url": file_url,
+                    "headers": {k: head.headers.get(k) for k in ("ETag", "Last-Modified")}
+                }, f)
+        except Exception:
+            pass
+
+    # Carrera concurrente entre ambas fuentes: gana la primera en responder
+    try:
+        with st.spinner("Descargando datos (fuentes en paralelo)..."):
+            ganador = _descargar_concurrente(file_urls)
+        if ganador is not None:
+            url_ganadora, contenido = ganador
+            df = _leer_excel(io.BytesIO(contenido))
+            if _validar_columnas(df, "Descarga concurrente"):
+                df = _procesar_df(df)
+                _persistir_parquet(df, url_ganadora)
+                return df
+    except Exception as e:
+        st.warning(f"Descarga concurrente fallida: {str(e)}")
+
+    # Fallback serial: gdown sí maneja la página de confirmación de Drive
+    for i, file_url in enumerate(file_urls):
+        temp_file = None
+        try:
+            with st.spinner(f"Descargando desde fuente {i+1}..."):
+                # Método de descarga alternativo
+                if "drive.google.com" in file_url:
+                    # gdown necesita escribir a disco para manejar la
+                    # página de confirmación de Google Drive
+                    import gdown
+                    temp_file = os.path.join(tempfile.gettempdir(), f"ventas_spv_temp_{int(time.time())}_{i}.xlsx")
+                    gdown.download(file_url, temp_file, quiet=True, fuzzy=True)
+
+                    if os.path.getsize(temp_file) == 0:
+                        raise ValueError("El archivo descargado está vacío")
+                    origen = temp_file
+                else:
+                    import requests
+                    headers = {
+                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+                    }
+                    response = requests.get(file_url, headers=headers, stream=True, timeout=30)
+                    response.raise_for_status()
+
+                    # Descarga directa a memoria: evita el archivo temporal,
+                    # con chunks grandes para reducir iteraciones en Python
+                    buf = io.BytesIO()
+                    for chunk in response.iter_content(chunk_size=65536):
+                        if chunk:
+                            buf.write(chunk)
+
+                    if buf.getbuffer().nbytes == 0:
+                        raise ValueError("El archivo descargado está vacío")
+                    buf.seek(0)
+                    origen = buf
+
+            df = _leer_excel(origen)
+            
+            # Validación de columnas
+            if not _validar_columnas(df, f"Fuente {i+1}"):
+                continue
+
+            # Derivar tipos y fechas antes de persistir, para que el caché
+            # Parquet ya incluya las columnas procesadas
+            df = _procesar_df(df)
+            _persistir_parquet(df, file_url)
+
+            # Procesamiento exitoso
+            return df
+            
+        except Exception as e:
+            st.warning(f"Intento {i+1} fallido: {str(e)}")
+            continue
+            
+        finally:
+            # Limpieza garantizada del archivo temporal (solo ruta gdown)
+            if temp_file is not None and os.path.exists(temp_file):
+                try:
+                    os.remove(temp_file)
+                except:
+                    pass
+    
+    st.error("❌ No se pudo cargar el archivo desde ninguna fuente disponible")
+    return None
+
+# =============================================
+# CARGA Y VALIDACIÓN DE DATOS
+# =============================================
+with st.spinner("🔍 Cargando y validando datos..."):
+    df = load_data()
+
+# Validación de datos cargados
+if df is None:
+    st.error("🚨 No se pudieron cargar los datos. La aplicación se detendrá.")
+    st.stop()
+
+if not isinstance(df, pd.DataFrame) or df.empty:
+    st.error("⚠️ Los datos cargados no son válidos o están vacíos.")
+    st.stop()
+
+# =============================================
+# PROCESAMIENTO DE DATOS
+# =============================================
+try:
+    # Los tipos y componentes de fecha ya vienen derivados desde load_data()
+    # Definir variables globales para fechas
+    global fecha_min, fecha_max
+    fecha_min = df['Fecha Pedido'].min().strftime('%d/%m/%Y')
+    fecha_max = df['Fecha Pedido'].max().strftime('%d/%m/%Y')
+
+except Exception as e:
+    st.error(f"❌ Error al procesar fechas: {str(e)}")
+    st.stop()
+
+# =============================================
+# FUNCIONES AUXILIARES CACHEADAS
+# =============================================
+@st.cache_data
+def partition_by_year_month(df):
+    """Particiona el DataFrame por (Ano, Mes) una sola vez.
+
+    Filtrar por año y mes pasa a ser un lookup O(filas-del-mes) en lugar
+    de construir dos máscaras booleanas sobre todo el DataFrame por rerun.
+    """
+    return {k: v for k, v in df.groupby(['Ano', 'Mes'], observed=True, sort=False)}
+
+@st.cache_data
+def centro_row_idx(df):
+    """Posiciones de fila por código de Centro, para selecciones dispersas.
+
+    Con pocos centros seleccionados, tomar directamente sus filas cuesta
+    en proporción al resultado, no al DataFrame completo.
+    """
+    codes = df['Centro'].cat.codes.to_numpy()
+    return {c: np.flatnonzero(codes == c) for c in range(len(df['Centro'].cat.categories))}
+
+@st.cache_data
+def year_month_row_idx(df):
+    """Posiciones de fila por (Ano, Mes), complemento de la partición."""
+    return dict(df.groupby(['Ano', 'Mes'], observed=True, sort=False).indices)
+
+@st.cache_data
+def monthly_sums(df):
+    """Totales mensuales por Centro/Vendedor, calculados una sola vez.
+
+    Los KPIs de la pestaña 1 (incluida la comparación con el mes anterior)
+    se resuelven como lookups sobre esta tabla en lugar de re-filtrar y
+    sumar el DataFrame completo en cada rerun.
+    """
+    return df.groupby(['Ano', 'Mes', 'Centro', 'Vendedor'], observed=True)[['Monto Total', 'Caja']].sum()
+
+@st.cache_data
+def option_lists(df):
+    """Opciones de los filtros, calculadas una sola vez por carga de datos.
+
+    Evita re-escanear columnas completas con unique() en cada rerun: las
+    columnas categóricas ya tienen sus categorías precalculadas.
+    """
+    return {
+        'anos': sorted(df['Ano'].unique().tolist()),
+        'meses_por_ano': {a: sorted(g.unique().tolist()) for a, g in df.groupby('Ano', observed=True)['Mes']},
+        'centros': df['Centro'].cat.categories.tolist(),
+        'vendedores': df['Vendedor'].cat.categories.tolist(),
+        'productos': df['Nombre Producto'].cat.categories.tolist(),
+    }
+
+@st.cache_data
+def by_cliente_index(df_filtrado):
+    """df_filtrado indexado y ordenado por Nombre Cliente.
+
+    Seleccionar clientes pasa a ser una búsqueda binaria sobre el índice
+    ordenado en lugar de dos escaneos booleanos de la misma columna.
+    """
+    # rename_axis(None): el índice no puede compartir nombre con la columna
+    # o los groupby posteriores sobre 'Nombre Cliente' fallan por ambigüedad
+    return df_filtrado.set_index('Nombre Cliente', drop=False).sort_index().rename_axis(None)
+
+@st.cache_data
+def by_producto_index(df):
+    """DataFrame completo indexado y ordenado por Nombre Producto."""
+    return df.set_index('Nombre Producto', drop=False).sort_index().rename_axis(None)
+
+@st.cache_data
+def daily_per_cliente(df_filtrado):
+    """Evolución diaria por cliente, agregada una sola vez por filtro.
+
+    Cambiar el cliente del selectbox pasa a ser un slice del MultiIndex
+    en lugar de un groupby completo por interacción.
+    """
+    return df_filtrado.groupby(['Nombre Cliente', 'FechaDia'], observed=True).agg(**{
+        'Monto Total': ('Monto Total', 'sum'),
+        'PedidoId': ('PedidoId', 'nunique')
+    }).sort_index()
+
+@st.cache_data
+def monthly_per_producto(df):
+    """Evolución mensual por producto, agregada una sola vez."""
+    return df.groupby(['Nombre Producto', 'FechaMes'], observed=True).agg(**{
+        'Monto Total': ('Monto Total', 'sum'),
+        'PedidoId': ('PedidoId', 'nunique'),
+        'Cantidad': ('Cantidad', 'sum')
+    }).sort_index()
+
+@st.cache_data
+def build_fig_ventas_vendedor(ventas_vendedor):
+    """Figura de ventas por vendedor, cacheada como JSON por tabla agregada.
+
+    Si los filtros no cambiaron, la tabla agregada es la misma y la figura
+    se recupera del caché en vez de reconstruirse.
+    """
+    # go.Bar directo sobre arrays: evita la normalización de DataFrames
+    # de plotly.express al construir la figura
+    fig = go.Figure(go.Bar(
+        x=ventas_vendedor['Vendedor'].to_numpy(),
+        y=ventas_vendedor['Monto Total'].to_numpy(),
+        marker=dict(
+            color=ventas_vendedor['Pedido'].to_numpy(),
+            colorbar=dict(title='N° Pedidos'),
+            showscale=True
+        ),
+        customdata=ventas_vendedor['Caja'].to_numpy(),
+        hovertemplate='%{x}<br>Ventas ($): %{y:,.0f}<br>Cajas: %{customdata:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(
+        title='**Ventas Totales por Vendedor**',
+        xaxis_title='Vendedor',
+        yaxis_title='Ventas ($)'
+    )
+    return fig.to_json()
+
+@st.cache_data
+def build_fig_ventas_centro(ventas_centro):
+    """Figura de distribución por centro, cacheada como JSON."""
+    fig = go.Figure(go.Pie(
+        labels=ventas_centro['Centro'].to_numpy(),
+        values=ventas_centro['Monto Total'].to_numpy(),
+        hole=0.3,
+        customdata=ventas_centro['Caja'].to_numpy(),
+        hovertemplate='%{label}<br>Ventas: %{value:,.0f}<br>Cajas: %{customdata:,.0f}<extra></extra>'
+    ))
+    fig.update_layout(title='**Distribución de Ventas por Centro**')
+    return fig.to_json()
+
+@st.cache_data
+def build_fig_pedidos_dia_semana(pedidos_dia_semana, objetivo):
+    """Figura de pedidos por día de la semana, cacheada como JSON."""
+    # Limitar las combinaciones (día, vendedor) a los vendedores con más
+    # pedidos para no saturar el render del gráfico agrupado
+    top_vendedores = (pedidos_dia_semana.groupby('Vendedor', observed=True)['Pedido']
+                      .sum().nlargest(15).index)
+    pedidos_dia_semana = pedidos_dia_semana[pedidos_dia_semana['Vendedor'].isin(top_vendedores)]
+
+    fig = go.Figure()
+    for vendedor, grupo in pedidos_dia_semana.groupby('Vendedor', observed=True):
+        fig.add_trace(go.Bar(
+            x=grupo['Dia Semana'].astype(str).to_numpy(),
+            y=grupo['Pedido'].to_numpy(),
+            name=str(vendedor)
+        ))
+    fig.update_layout(
+        barmode='group',
+        title='**Pedidos por Día de la Semana**',
+        xaxis_title='Día',
+        yaxis_title='N° de Pedidos'
+    )
+    fig.add_hline(y=objetivo, line_dash="dash", line_color="red", annotation_text="Objetivo Diario")
+    return fig.to_json()
+
+@st.cache_data
+def all_aggs(df_filtrado):
+    """Agregados por vendedor y por centro que comparten las pestañas 1 y 2.
+
+    Una sola pasada por dimensión sobre el frame filtrado: las ventas por
+    vendedor, las métricas de pedidos y la distribución por centro salen
+    del mismo resultado cacheado.
+    """
+    gv = df_filtrado.groupby('Vendedor', observed=True, sort=False)
+    gc = df_filtrado.groupby('Centro', observed=True, sort=False)
+    return {
+        'vendedor': gv.agg(**{
+            'Monto Total': ('Monto Total', 'sum'),
+            'Pedido': ('PedidoId', 'nunique'),
+            'Caja': ('Caja', 'sum'),
+            'Dia': ('Dia', 'nunique')
+        }).reset_index(),
+        'centro': gc.agg(**{
+            'Monto Total': ('Monto Total', 'sum'),
+            'Caja': ('Caja', 'sum')
+        }).reset_index()
+    }
+
+# =============================================
+# BARRA LATERAL (FILTROS)
+# =============================================
+st.sidebar.title("🔍 Filtros Principales")
+st.sidebar.markdown("---")
+
+# Los filtros van dentro de un formulario: cambiar varios widgets produce
+# un solo rerun al pulsar Aplicar, en vez de un recálculo por cada cambio
+try:
+    opciones = option_lists(df)
+    with st.sidebar.form("filtros"):
+        # Selector de Año
+        años_disponibles = opciones['anos']
+        año_seleccionado = st.selectbox(
+            "**Seleccione el Año**",
+            options=años_disponibles,
+            index=len(años_disponibles)-1
+        )
+
+        # Selector de Mes (las opciones se refrescan al aplicar el año)
+        meses_disponibles = opciones['meses_por_ano'].get(año_seleccionado, [])
+        mes_seleccionado = st.selectbox(
+            "**Seleccione el Mes**",
+            options=meses_disponibles,
+            index=len(meses_disponibles)-1 if meses_disponibles else 0
+        )
+
+        # Filtros adicionales
+        centros_disponibles = opciones['centros']
+        centros_seleccionados = st.multiselect(
+            "**Filtrar por Centro**",
+            options=centros_disponibles,
+            default=centros_disponibles
+        )
+
+        vendedores_disponibles = opciones['vendedores']
+        vendedores_seleccionados = st.multiselect(
+            "**Filtrar por Vendedor**",
+            options=vendedores_disponibles,
+            default=vendedores_disponibles
+        )
+
+        st.form_submit_button("✅ Aplicar filtros")
+except Exception as e:
+    st.error(f"❌ Error en los filtros: {str(e)}")
+    st.stop()
+
+# Aplicar filtros
+try:
+    categorias_centro = df['Centro'].cat.categories
+    codigos_centro = categorias_centro.get_indexer(centros_seleccionados)
+    codigos_vendedor = df['Vendedor'].cat.categories.get_indexer(vendedores_seleccionados)
+
+    if len(centros_seleccionados) < 0.2 * len(categorias_centro):
+        # Selección dispersa: intersecar las filas precalculadas de cada
+        # centro con las del mes, en vez de enmascarar todo el mes
+        filas_centro = np.concatenate([centro_row_idx(df)[c] for c in codigos_centro]) \
+            if len(codigos_centro) else np.array([], dtype=np.intp)
+        filas_mes = year_month_row_idx(df).get((año_seleccionado, mes_seleccionado),
+                                               np.array([], dtype=np.intp))
+        filas = np.intersect1d(filas_centro, filas_mes, assume_unique=True)
+        sub = df.iloc[filas]
+        mask = np.isin(sub['Vendedor'].cat.codes.to_numpy(), codigos_vendedor)
+    else:
+        # Partición precalculada por (Ano, Mes) + máscara combinada sobre
+        # códigos categóricos, con AND in-place para evitar temporales
+        sub = partition_by_year_month(df).get((año_seleccionado, mes_seleccionado), df.iloc[:0])
+        mask = np.isin(sub['Centro'].cat.codes.to_numpy(), codigos_centro)
+        np.logical_and(mask, np.isin(sub['Vendedor'].cat.codes.to_numpy(), codigos_vendedor), out=mask)
+
+    df_filtrado = sub.iloc[np.flatnonzero(mask)]
+
+    if df_filtrado.empty:
+        st.warning("⚠️ No hay datos con los filtros seleccionados. Mostrando todos los datos.")
+        df_filtrado = df
+except Exception as e:
+    st.error(f"❌ Error al aplicar filtros: {str(e)}")
+    st.stop()
+
+# =============================================
+# PESTAÑAS PRINCIPALES
+# =============================================
+# st.tabs ejecuta los cuatro bloques en cada rerun aunque solo uno sea
+# visible; con un radio horizontal solo se calcula la vista activa
+vistas = [
+    "📈 Resumen Ventas",
+    "📋 Pedidos por Vendedor",
+    "🏢 Ventas por Cliente",
+    "🔎 Búsqueda de Productos"
+]
+vista_activa = st.radio("Vista", vistas, horizontal=True, label_visibility="collapsed")
+
+# --- Pestaña 1: Resumen de Ventas ---
+if vista_activa == vistas[0]:
+    try:
+        st.header("📊 Resumen General de Ventas")
+        
+        # KPIs principales (sumas mensuales precalculadas). Si el filtro cayó
+        # al fallback "mostrando todos los datos", el lookup mensual ya no
+        # describe lo que muestran las gráficas: todos los KPIs se calculan
+        # entonces sobre el mismo df_filtrado
+        sumas_mensuales = monthly_sums(df)
+        try:
+            if df_filtrado is df:
+                raise KeyError("filtro sin datos")
+            fila_mes = sumas_mensuales.loc[pd.IndexSlice[año_seleccionado, mes_seleccionado,
+                                                         centros_seleccionados, vendedores_seleccionados]]
+            ventas_totales = fila_mes['Monto Total'].sum()
+            cajas_totales = fila_mes['Caja'].sum()
+        except KeyError:
+            ventas_totales = df_filtrado['Monto Total'].sum()
+            cajas_totales = df_filtrado['Caja'].sum()
+        pedidos_totales = df_filtrado['PedidoId'].nunique()
+        ticket_promedio = ventas_totales / pedidos_totales if pedidos_totales > 0 else 0
+        clientes_unicos = df_filtrado['Codigo Cliente'].nunique()
+        
+        # Mostrar KPIs
+        col1, col2, col3, col4, col5 = st.columns(5)
+        col1.metric("**Ventas Totales**", f"${ventas_totales:,.0f}")
+        col2.metric("**Cajas Vendidas**", f"{cajas_totales:,.0f}")
+        col3.metric("**Pedidos Realizados**", f"{pedidos_totales:,.0f}")
+        col4.metric("**Ticket Promedio**", f"${ticket_promedio:,.0f}")
+        col5.metric("**Clientes Atendidos**", f"{clientes_unicos:,.0f}")
+        
+        st.markdown("---")
+        
+        # Comparación con mes anterior
+        st.subheader("📅 Comparación Mensual")
+        
+        mes_anterior = mes_seleccionado - 1 if mes_seleccionado > 1 else 12
+        año_mes_anterior = año_seleccionado if mes_seleccionado > 1 else año_seleccionado - 1
+        
+        # Lookup sobre los totales mensuales precalculados
+        try:
+            ventas_mes_anterior = sumas_mensuales.loc[pd.IndexSlice[
+                año_mes_anterior, mes_anterior,
+                centros_seleccionados, vendedores_seleccionados
+            ]]['Monto Total'].sum()
+        except KeyError:
+            ventas_mes_anterior = 0
+        variacion = ((ventas_totales - ventas_mes_anterior) / ventas_mes_anterior * 100) if ventas_mes_anterior != 0 else 0
+        
+        col1, col2 = st.columns(2)
+        col1.metric(
+            f"**Ventas {mes_seleccionado}/{año_seleccionado}**",
+            f"${ventas_totales:,.0f}",
+            f"{variacion:.1f}% vs mes anterior",
+            delta_color="inverse" if variacion < 0 else "normal"
+        )
+        col2.metric(
+            f"**Ventas {mes_anterior}/{año_mes_anterior}**",
+            f"${ventas_mes_anterior:,.0f}"
+        )
+        
+        st.markdown("---")
+        
+        # Gráficos de análisis
+        st.subheader("📊 Análisis por Dimensiones")
+        
+        # Ventas por vendedor (agregados compartidos con la pestaña 2)
+        aggs = all_aggs(df_filtrado)
+        ventas_vendedor = aggs['vendedor'].sort_values('Monto Total', ascending=False)
+        
+        fig1 = go.Figure(json.loads(build_fig_ventas_vendedor(ventas_vendedor)))
+        st.plotly_chart(fig1, use_container_width=True)
+        
+        # Ventas por centro
+        ventas_centro = aggs['centro'].sort_values('Monto Total', ascending=False)
+        
+        fig2 = go.Figure(json.loads(build_fig_ventas_centro(ventas_centro)))
+        st.plotly_chart(fig2, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ Error en la pestaña de Resumen: {str(e)}")
+
+# --- Pestaña 2: Pedidos por Vendedor ---
+if vista_activa == vistas[1]:
+    try:
+        st.header("📋 Análisis de Pedidos por Vendedor")
+        
+        # Configuración de objetivos
+        st.subheader("🎯 Configuración de Objetivos")
+        objetivo_default = 45
+        objetivo = st.number_input(
+            "**Establezca el objetivo diario de pedidos por vendedor**",
+            min_value=1,
+            value=objetivo_default,
+            step=1
+        )
+        
+        st.markdown("---")
+        
+        # Cálculo de métricas
+        dias_habiles = df_filtrado['Dia'].nunique()
+        objetivo_mensual = objetivo * dias_habiles
+        
+        pedidos_vendedor = all_aggs(df_filtrado)['vendedor'][['Vendedor', 'Pedido', 'Dia', 'Monto Total']].copy()
+        
+        pedidos_vendedor['Pedidos/Día'] = pedidos_vendedor['Pedido'] / pedidos_vendedor['Dia']
+        pedidos_vendedor['Cumplimiento %'] = (pedidos_vendedor['Pedidos/Día'] / objetivo) * 100
+        pedidos_vendedor['Desviación'] = pedidos_vendedor['Pedido'] - objetivo_mensual
+        
+        # Mostrar tabla resumen
+        st.subheader("📊 Cumplimiento por Vendedor")
+        
+        st.dataframe(
+            pedidos_vendedor.sort_values('Cumplimiento %', ascending=False),
+            column_config={
+                "Vendedor": "Vendedor",
+                "Pedido": st.column_config.NumberColumn("Total Pedidos", format="%d"),
+                "Dia": st.column_config.NumberColumn("Días Trabajados", format="%d"),
+                "Pedidos/Día": st.column_config.NumberColumn("Pedidos/Día", format="%.1f"),
+                "Cumplimiento %": st.column_config.ProgressColumn(
+                    "Cumplimiento %",
+                    format="%.1f%%",
+                    min_value=0,
+                    max_value=150
+                ),
+                "Desviación": st.column_config.NumberColumn("Desviación vs Objetivo", format="%+d"),
+                "Monto Total": st.column_config.NumberColumn("Ventas Generadas", format="$%.0f")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        st.markdown("---")
+        
+        # Gráfico de tendencia de pedidos
+        st.subheader("📈 Tendencia de Pedidos")
+        
+        pedidos_dia_semana = df_filtrado.groupby(['Dia Semana', 'Vendedor'], observed=True).agg(
+            Pedido=('PedidoId', 'nunique')
+        ).reset_index()
+        
+        fig3 = go.Figure(json.loads(build_fig_pedidos_dia_semana(pedidos_dia_semana, objetivo)))
+        st.plotly_chart(fig3, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ Error en la pestaña de Pedidos: {str(e)}")
+
+# --- Pestaña 3: Ventas por Cliente ---
+if vista_activa == vistas[2]:
+    try:
+        st.header("🏢 Análisis de Ventas por Cliente")
+        
+        # Selector de clientes
+        clientes_seleccionados = st.multiselect(
+            "**Seleccione clientes para analizar**",
+            options=df_filtrado['Nombre Cliente'].unique(),
+            default=df_filtrado['Nombre Cliente'].unique()[:3] if len(df_filtrado['Nombre Cliente'].unique()) > 0 else []
+        )
+        
+        if not clientes_seleccionados:
+            st.warning("⚠️ Por favor seleccione al menos un cliente.")
+            st.stop()
+        
+        idx_clientes = by_cliente_index(df_filtrado)
+        df_clientes = idx_clientes.loc[clientes_seleccionados]
+        
+        # Resumen por cliente
+        st.subheader("📋 Resumen por Cliente")
+        
+        resumen_clientes = df_clientes.groupby(['Codigo Cliente', 'Nombre Cliente'], observed=True).agg({
+            'PedidoId': 'nunique',
+            'Monto Total': 'sum',
+            'Caja': 'sum',
+            'Fecha Pedido': ['min', 'max']
+        }).reset_index()
+        
+        resumen_clientes.columns = [' '.join(col).strip() for col in resumen_clientes.columns.values]
+        
+        st.dataframe(
+            resumen_clientes.sort_values('Monto Total sum', ascending=False),
+            column_config={
+                "Codigo Cliente": "Código",
+                "Nombre Cliente": "Cliente",
+                "PedidoId nunique": st.column_config.NumberColumn("Pedidos", format="%d"),
+                "Monto Total sum": st.column_config.NumberColumn("Total Vendido", format="$%.0f"),
+                "Caja sum": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
+                "Fecha Pedido min": st.column_config.DateColumn("Primer Pedido"),
+                "Fecha Pedido max": st.column_config.DateColumn("Último Pedido")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        st.markdown("---")
+        
+        # Detalle por cliente seleccionado
+        st.subheader("🔍 Detalle por Cliente")
+        
+        cliente_seleccionado = st.selectbox(
+            "**Seleccione un cliente para ver detalle**",
+            options=df_clientes['Nombre Cliente'].unique()
+        )
+        
+        df_cliente = idx_clientes.loc[[cliente_seleccionado]]
+        
+        # Productos más comprados por el cliente
+        st.markdown(f"#### 🛍️ Productos más comprados por {cliente_seleccionado}")
+        
+        productos_cliente = df_cliente.groupby(['Codigo Producto', 'Nombre Producto'], observed=True).agg({
+            'Cantidad': 'sum',
+            'Monto Total': 'sum',
+            'Caja': 'sum',
+            'PedidoId': 'nunique'
+        }).reset_index().sort_values('Monto Total', ascending=False)
+        
+        st.dataframe(
+            productos_cliente,
+            column_config={
+                "Codigo Producto": "Código",
+                "Nombre Producto": "Producto",
+                "Cantidad": st.column_config.NumberColumn("Cantidad Total", format="%d"),
+                "Monto Total": st.column_config.NumberColumn("Total Vendido", format="$%.0f"),
+                "Caja": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
+                "PedidoId": st.column_config.NumberColumn("Veces Pedido", format="%d")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        # Evolución temporal de compras
+        st.markdown(f"#### 📅 Evolución Temporal de Compras - {cliente_seleccionado}")
+        
+        evolucion = daily_per_cliente(df_filtrado).loc[cliente_seleccionado] \
+            .reset_index().rename(columns={'FechaDia': 'Fecha Pedido'})
+        
+        fig4 = make_subplots(specs=[[{"secondary_y": True}]])
+        
+        fig4.add_trace(
+            go.Scattergl(
+                x=evolucion['Fecha Pedido'].to_numpy(),
+                y=evolucion['Monto Total'].to_numpy(),
+                mode='lines+markers',
+                name='Ventas ($)'
+            ),
+            secondary_y=False
+        )
+
+        fig4.add_trace(
+            go.Bar(
+                x=evolucion['Fecha Pedido'].to_numpy(),
+                y=evolucion['PedidoId'].to_numpy(),
+                opacity=0.3,
+                name='N° Pedidos'
+            ),
+            secondary_y=True
+        )
+        
+        fig4.update_layout(
+            title=f"Ventas a {cliente_seleccionado} por Fecha",
+            xaxis_title="Fecha",
+            yaxis_title="Ventas ($)",
+            yaxis2_title="N° Pedidos",
+            showlegend=True
+        )
+        
+        st.plotly_chart(fig4, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ Error en la pestaña de Clientes: {str(e)}")
+
+# --- Pestaña 4: Búsqueda de Productos ---
+if vista_activa == vistas[3]:
+    try:
+        st.header("🔎 Búsqueda Avanzada de Productos")
+        
+        # Selector de productos
+        productos_buscar = st.multiselect(
+            "**Seleccione productos a analizar**",
+            options=opciones['productos'],
+            default=opciones['productos'][:2]
+        )
+        
+        if not productos_buscar:
+            st.info("ℹ️ Seleccione al menos un producto para realizar la búsqueda.")
+            st.stop()
+        
+        idx_productos = by_producto_index(df)
+        df_productos = idx_productos.loc[productos_buscar]
+        
+        # Resumen de productos seleccionados
+        st.subheader("📋 Resumen de Productos Seleccionados")
+        
+        resumen_productos = df_productos.groupby(['Codigo Producto', 'Nombre Producto'], observed=True).agg({
+            'PedidoId': 'nunique',
+            'Cantidad': 'sum',
+            'Monto Total': 'sum',
+            'Caja': 'sum',
+            'Nombre Cliente': 'nunique',
+            'Fecha Pedido': ['min', 'max']
+        }).reset_index()
+        
+        resumen_productos.columns = [' '.join(col).strip() for col in resumen_productos.columns.values]
+        
+        st.dataframe(
+            resumen_productos,
+            column_config={
+                "Codigo Producto": "Código",
+                "Nombre Producto": "Producto",
+                "PedidoId nunique": st.column_config.NumberColumn("Pedidos", format="%d"),
+                "Cantidad sum": st.column_config.NumberColumn("Cantidad Total", format="%d"),
+                "Monto Total sum": st.column_config.NumberColumn("Ventas Totales", format="$%.0f"),
+                "Caja sum": st.column_config.NumberColumn("Cajas Vendidas", format="%d"),
+                "Nombre Cliente nunique": st.column_config.NumberColumn("Clientes Únicos", format="%d"),
+                "Fecha Pedido min": st.column_config.DateColumn("Primera Venta"),
+                "Fecha Pedido max": st.column_config.DateColumn("Última Venta")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        st.markdown("---")
+        
+        # Detalle por producto seleccionado
+        st.subheader("🔍 Detalle por Producto")
+        
+        producto_seleccionado = st.selectbox(
+            "**Seleccione un producto para ver detalle**",
+            options=productos_buscar
+        )
+        
+        df_producto = idx_productos.loc[[producto_seleccionado]]
+        
+        # Clientes que compraron este producto
+        st.markdown(f"#### 🧑‍💼 Clientes que compraron {producto_seleccionado}")
+        
+        clientes_producto = df_producto.groupby(['Codigo Cliente', 'Nombre Cliente'], observed=True).agg({
+            'PedidoId': 'nunique',
+            'Cantidad': 'sum',
+            'Monto Total': 'sum',
+            'Caja': 'sum',
+            'Fecha Pedido': 'max'
+        }).reset_index().sort_values('Monto Total', ascending=False)
+        
+        st.dataframe(
+            clientes_producto,
+            column_config={
+                "Codigo Cliente": "Código",
+                "Nombre Cliente": "Cliente",
+                "PedidoId": st.column_config.NumberColumn("Veces Comprado", format="%d"),
+                "Cantidad": st.column_config.NumberColumn("Cantidad Total", format="%d"),
+                "Monto Total": st.column_config.NumberColumn("Total Gastado", format="$%.0f"),
+                "Caja": st.column_config.NumberColumn("Cajas Compradas", format="%d"),
+                "Fecha Pedido": st.column_config.DateColumn("Última Compra")
+            },
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        # Evolución temporal de ventas del producto
+        st.markdown(f"#### 📈 Evolución de Ventas - {producto_seleccionado}")
+        
+        evolucion_producto = monthly_per_producto(df).loc[producto_seleccionado] \
+            .reset_index().rename(columns={'FechaMes': 'Fecha Pedido'})
+        
+        fig5 = go.Figure(go.Scattergl(
+            x=evolucion_producto['Fecha Pedido'].to_numpy(),
+            y=evolucion_producto['Monto Total'].to_numpy(),
+            mode='lines+markers',
+            name='Ventas ($)'
+        ))
+        fig5.update_layout(
+            title=f"Ventas Mensuales de {producto_seleccionado}",
+            xaxis_title='Mes',
+            yaxis_title='Ventas ($)'
+        )
+        fig5.add_bar(x=evolucion_producto['Fecha Pedido'], y=evolucion_producto['PedidoId'], name="N° Pedidos")
+        st.plotly_chart(fig5, use_container_width=True)
+        
+    except Exception as e:
+        st.error(f"❌ Error en la pestaña de Productos: {str(e)}")
+
+# =============================================
+# BARRA LATERAL (INFORMACIÓN ADICIONAL)
+# =============================================
+st.sidebar.markdown("---")
+st.sidebar.markdown("**📌 Notas:**")
+st.sidebar.markdown("- Los datos se actualizan automáticamente al cambiar los filtros")
+st.sidebar.markdown("- Use los controles de los gráficos para zoom y detalles")
+st.sidebar.markdown("- Exporte datos con el menú de los gráficos (ícono de cámara)")
+
+st.sidebar.markdown("---")
+
+# Agregar botón de actualización
+if st.sidebar.button("🔄 Actualizar Datos", help="Haz clic para forzar la actualización de los datos"):
+    st.cache_data.clear()
+    st.cache_resource.clear()
+    st.rerun()
+
+st.sidebar.markdown(f"📅 **Datos desde:** {fecha_min} **hasta** {fecha_max}")
+st.sidebar.markdown(f"🔄 **Última actualización:** {datetime.now().strftime('%d/%m/%Y %H:%M')}")